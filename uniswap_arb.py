@@ -1,12 +1,18 @@
 
-from scipy.optimize import minimize, Bounds
 import click
+from numba import guvectorize, njit
 
+import math
 import timeit
 import random
 import logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(logging.WARNING)
+
+DAI, ETH = 0, 1
+SWAP_FEE = 0.003
+GAMMA = 1 - SWAP_FEE
+TOKENS = {"DAI": DAI, "ETH": ETH}
 
 class UniswapPool:
     def __init__(self, X, Y):
@@ -18,8 +24,8 @@ class UniswapPool:
         :type X:  float
         :param Y: amount of ETH token at the start 
         :type Y:  float
-        :param K: the equation X*Y=K where K will remain constant throughout the life of the pool.
-                  determined by initial amounts X and Y.
+        :param K: the equation X*Y=K, computed from the current X and Y so it never goes stale.
+                  Swap fees stay in the pool, so K grows with every swap.
         :type K: float
         :param swap_fee: the fees taken as proportion of input amount for any swap
         :type swap_fee: flaot
@@ -28,8 +34,12 @@ class UniswapPool:
             raise ValueError("Invalid input token amounts: can't have negative or zero tokens")
         self.X = X
         self.Y = Y
-        self.K = X * Y
-        self.swap_fee = 0.003
+        self.swap_fee = SWAP_FEE
+        self._net = GAMMA
+
+    @property
+    def K(self):
+        return self.X * self.Y
        
     def add_liquidity(self, X, Y):
         if X/Y != self.X/self.Y:
@@ -38,7 +48,6 @@ class UniswapPool:
             raise ValueError("Invalid input token amounts: can't add negative or zero tokens")
         self.X += X
         self.Y += Y
-        self.K = self.X * self.Y
 
     def remove_liquidity(self, X, Y):
         if X/Y != self.X/self.Y:
@@ -47,7 +56,6 @@ class UniswapPool:
             raise ValueError("Invalid input token amounts: can't remove negative or zero tokens")
         self.X -= X
         self.Y -= Y
-        self.K = self.X * self.Y
 
     def swap(self, input_token, input_amount):
         """
@@ -61,23 +69,22 @@ class UniswapPool:
         """
         if input_amount <= 0:
             raise ValueError("Invalid input token amount: can't swap negative or zero tokens")
-        if input_token == "DAI":
-            output_amount = self.output(input_token, input_amount)
-            logger.info(f"Old DAI: {self.X} | Old ETH: {self.Y} | Old K: {self.K}")
+        token = TOKENS.get(input_token)
+        if token == DAI:
+            output_amount = self.output(token, input_amount)
+            logger.debug("Old DAI: %s | Old ETH: %s | Old K: %s", self.X, self.Y, self.K)
             self.X += input_amount
             self.Y -= output_amount
-            self.K = self.X * self.Y
-            logger.info(f"Input: {input_amount} DAI | Output: {output_amount} ETH")
-            logger.info(f"New DAI: {self.X} | New ETH: {self.Y} | New K: {self.K}")
+            logger.debug("Input: %s DAI | Output: %s ETH", input_amount, output_amount)
+            logger.debug("New DAI: %s | New ETH: %s | New K: %s", self.X, self.Y, self.K)
             return output_amount 
-        elif input_token == "ETH":
-            output_amount = self.output(input_token, input_amount)  
-            logger.info(f"Old DAI: {self.X} | New ETH: {self.Y} | Old K: {self.K}")
+        elif token == ETH:
+            output_amount = self.output(token, input_amount)
+            logger.debug("Old DAI: %s | Old ETH: %s | Old K: %s", self.X, self.Y, self.K)
             self.Y += input_amount
             self.X -= output_amount
-            self.K = self.X * self.Y
-            logger.info(f"Input: {input_amount} ETH | Output: {output_amount} DAI")
-            logger.info(f"New DAI: {self.X} | New ETH: {self.Y} | New K: {self.K}")
+            logger.debug("Input: %s ETH | Output: %s DAI", input_amount, output_amount)
+            logger.debug("New DAI: %s | New ETH: %s | New K: %s", self.X, self.Y, self.K)
             return output_amount
         else:
             raise ValueError("Invalid input/output token combination")
@@ -86,25 +93,56 @@ class UniswapPool:
         """
         Calculates the output amount after considering the swap fee.
 
-        :param input_token: Name of input token, either "DAI" or "ETH"
-        :type input_token: str
+        :param input_token: Input token, either DAI or ETH
+        :type input_token: int
         :param di: Amount of input token
         :type di: float
         :return: The output amount after applying the swap fee
         :rtype: float
         """
-        fees = self.swap_fee * di
-        _di = di - fees
-        if input_token == "DAI":
-            new_amt = self.K/(self.X + _di)
-            output_amount = self.Y - new_amt 
-        if input_token == "ETH":
-            new_amt = self.K/(self.Y + _di)
-            output_amount = self.X - new_amt
+        _di = self._net * di
+        if input_token == DAI:
+            output_amount = self.Y * _di/(self.X + _di)
+        elif input_token == ETH:
+            output_amount = self.X * _di/(self.Y + _di)
+        else:
+            raise ValueError("Invalid input token: expected DAI or ETH")
         return output_amount
 
 
 
+@njit("float64(float64, float64, float64, float64, float64, float64)", cache=True, fastmath=True)
+def _simulate_arb_kernel(dy, x_in, y_in, x_out, y_out, sign):
+    """
+    Compiled arithmetic of simulate_arb, with both swaps of UniswapPool.output inlined.
+    ETH is swapped for DAI in the (x_in, y_in) pool, then that DAI for ETH in the (x_out, y_out) pool.
+    The explicit signature compiles the kernel once at import (or loads it from the on-disk cache),
+    so no caller pays for compilation and integer reserves don't trigger a second specialisation.
+    """
+    out1 = (GAMMA * dy * x_in) / (y_in + GAMMA * dy)
+    out2 = (GAMMA * out1 * y_out) / (x_out + GAMMA * out1)
+    return sign * (out2 - dy)
+
+
+@njit("UniTuple(float64, 4)(float64, float64, float64, float64)", cache=True)
+def _order_pools(ax, ay, bx, by):
+    """
+    Orders the reserves as (x_in, y_in, x_out, y_out), where the ETH is swapped into the
+    pool with the cheaper DAI first. Equal prices fall through to pool_b first.
+    """
+    if by * ax > ay * bx:
+        return ax, ay, bx, by
+    return bx, by, ax, ay
+
+
+@njit("float64(float64, float64, float64, float64)", cache=True)
+def _optimal_input_kernel(x_in, y_in, x_out, y_out):
+    """
+    Compiled closed form of optimal_input, on reserves already ordered by _order_pools.
+    """
+    return (GAMMA * math.sqrt(x_in * y_in * x_out * y_out) - y_in * x_out) / (GAMMA * (x_out + GAMMA * x_in))
+
+
 def simulate_arb(dy, ax, ay, bx, by, sign=1.0):
     """
     Simulates an arbitrage opportunity between two Uniswap pools (pool_a and pool_b).
@@ -125,16 +163,62 @@ def simulate_arb(dy, ax, ay, bx, by, sign=1.0):
     :rtype: float
     :raises ValueError: If no arbitrage opportunity is available (prices are equal)
     """
-    pool_a = UniswapPool(ax, ay)
-    pool_b = UniswapPool(bx, by)
-    a_price, b_price = pool_a.Y/pool_a.X, pool_b.Y/pool_b.X 
-    if b_price > a_price:
-        return sign * (pool_b.swap('DAI', pool_a.swap('ETH', dy)) - dy)
-    elif a_price > b_price:
-        return sign * (pool_a.swap('DAI', pool_b.swap('ETH', dy)) - dy)
-    else:
+    a_price, b_price = ay * bx, by * ax
+    if a_price == b_price:
         raise ValueError("No arbitrage opportunity available")
-    
+    return _simulate_arb_kernel(dy, *_order_pools(ax, ay, bx, by), sign)
+
+
+def optimal_input(ax, ay, bx, by):
+    """
+    Calculates the ETH input that maximises the profit from simulate_arb in closed form.
+
+    Both swaps compose into a single constant product curve out(y') = A*y'/(B + C*y'), so the
+    profit out(y') - y' is maximised where out'(y') = 1, which gives
+    y* = (GAMMA*sqrt(X1*Y1*X2*Y2) - Y_in*X_out) / (GAMMA*(X_out + GAMMA*X_in)).
+    A non-positive result means the swap fees outweigh the price difference.
+
+    :param ax: Amount of DAI in pool_a at the start
+    :type ax: float
+    :param ay: Amount of ETH in pool_a at the start
+    :type ay: float
+    :param bx: Amount of DAI in pool_b at the start
+    :type bx: float
+    :param by: Amount of ETH in pool_b at the start
+    :type by: float
+    :return: The optimal amount of ETH to start the arbitrage with
+    :rtype: float
+    """
+    return _optimal_input_kernel(*_order_pools(ax, ay, bx, by))
+
+
+@guvectorize(["void(float64, float64, float64, float64, float64[:], float64[:])"],
+             "(),(),(),()->(),()", target="parallel", nopython=True, cache=True)
+def optimal_arb(ax, ay, bx, by, eth_in, eth_profit):
+    """
+    Vectorised optimal_input and simulate_arb over arrays of pool pairs, spread across all cores.
+    Pairs where the swap fees outweigh the price difference, or the prices are equal, get zero
+    input and zero profit, the same case optimal_profit reports as no arbitrage opportunity.
+
+    :param ax: Amounts of DAI in pool_a at the start
+    :type ax: np.ndarray
+    :param ay: Amounts of ETH in pool_a at the start
+    :type ay: np.ndarray
+    :param bx: Amounts of DAI in pool_b at the start
+    :type bx: np.ndarray
+    :param by: Amounts of ETH in pool_b at the start
+    :type by: np.ndarray
+    :return: The optimal ETH input and the resulting ETH profit for each pool pair (both 0 if unprofitable)
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    x_in, y_in, x_out, y_out = _order_pools(ax, ay, bx, by)
+    dy = _optimal_input_kernel(x_in, y_in, x_out, y_out)
+    if dy <= 0:
+        eth_in[0] = 0.0
+        eth_profit[0] = 0.0
+    else:
+        eth_in[0] = dy
+        eth_profit[0] = _simulate_arb_kernel(dy, x_in, y_in, x_out, y_out, 1.0)
 
 
 def optimal_profit(ax, ay, bx, by):
@@ -155,22 +239,18 @@ def optimal_profit(ax, ay, bx, by):
     """
     if ax <= 0 or ay <= 0 or bx <= 0 or by <= 0:
         raise ValueError("Invalid input token amounts: cannot have negative or zero tokens")
-    if ay/ax == by/bx:
+    if ay * bx == by * ax:
         raise ValueError("No arbitrage opportunity available") 
-    a, b = ax + ay, bx + by
-    total = a + b
-    lower, upper = 1e-05, b/total * abs(ax - ay) + a/total * abs(bx - by)
-    midpoint = upper/2
-    if by/bx > ay/ax:
+    if by * ax > ay * bx:
         b, s = 'A', 'B'
     else:
         b, s = 'B', 'A'
-    res = minimize(simulate_arb, x0=midpoint, bounds=Bounds(lower,upper), args=(ax, ay, bx, by, -1))
-    eth_in, eth_profit = res.x[0], -res.fun
-    if -res.fun <= 0:
-        print(f"Negative profit of {-res.fun} - no arbitrage opportunity exists")
-        return 0 
-    print(f'ETH in: {eth_in} | ETH profit: {-res.fun}')
+    eth_in = optimal_input(ax, ay, bx, by)
+    if eth_in <= 0:
+        print("Swap fees exceed the price difference - no arbitrage opportunity exists")
+        return 0
+    eth_profit = simulate_arb(eth_in, ax, ay, bx, by)
+    print(f'ETH in: {eth_in} | ETH profit: {eth_profit}')
     print(f"Buy DAI in pool {b} with {eth_in} ETH and sell it in pool {s} for a profit of {eth_profit}")
     return 1
 
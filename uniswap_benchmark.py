@@ -1,49 +1,54 @@
 import time
-from scipy.optimize import minimize, Bounds
 import numpy as np
 import pandas as pd
-from uniswap_arb import simulate_arb
+from uniswap_arb import optimal_arb
 
-def upper_bound(row):
+def upper_bound(ax, ay, bx, by):
     """
-    Calculate the upper bound for arbitrage profit given a row of input values.
+    Calculate the upper bound for arbitrage profit for arrays of pool pairs at once.
 
-    :param row: Row of input values representing DAI and ETH amounts in two pools
-    :type row: list or array-like
-    :return: Upper bound for arbitrage profit
-    :rtype: float
+    :param ax: Amounts of DAI in pool A at the start
+    :type ax: np.ndarray
+    :param ay: Amounts of ETH in pool A at the start
+    :type ay: np.ndarray
+    :param bx: Amounts of DAI in pool B at the start
+    :type bx: np.ndarray
+    :param by: Amounts of ETH in pool B at the start
+    :type by: np.ndarray
+    :return: Upper bound for arbitrage profit of each pool pair
+    :rtype: np.ndarray
     """
-    a, b = sum(row[:2]), sum(row[2:])
+    a, b = ax + ay, bx + by
     total = a + b
-    bound = b/total * abs(row[0] - row[1]) + a/total * abs(row[2] - row[3])
+    bound = b/total * np.abs(ax - ay) + a/total * np.abs(bx - by)
     return bound
 
 def time_optimal_profit(ax, ay, bx, by):
     """
-    Measure the time taken for the optimal_profit function to execute.
+    Measure the time taken to find the optimal arbitrage for a batch of pool pairs.
 
-    :param ax: Amount of DAI in pool A at the start
-    :type ax: float
-    :param ay: Amount of ETH in pool A at the start
-    :type ay: float
-    :param bx: Amount of DAI in pool B at the start
-    :type bx: float
-    :param by: Amount of ETH in pool B at the start
-    :type by: float
-    :return: Series containing the time taken and the number of iterations
-    :rtype: pd.Series
+    :param ax: Amounts of DAI in pool A at the start
+    :type ax: np.ndarray
+    :param ay: Amounts of ETH in pool A at the start
+    :type ay: np.ndarray
+    :param bx: Amounts of DAI in pool B at the start
+    :type bx: np.ndarray
+    :param by: Amounts of ETH in pool B at the start
+    :type by: np.ndarray
+    :return: Time taken to solve the whole batch in nanoseconds
+    :rtype: int
     """
-    t1 = time.perf_counter()
-    lower, upper = 1e-05, max(ay/ax, by/bx) * max(ax, bx)
-    midpoint = upper/2
-    res = minimize(simulate_arb, x0=midpoint, bounds=Bounds(lower,upper), args=(ax, ay, bx, by, -1))
-    t2 = time.perf_counter()
-    return pd.Series([t2 - t1, res.nit])
+    t1 = time.perf_counter_ns()
+    optimal_arb(ax, ay, bx, by)
+    t2 = time.perf_counter_ns()
+    return t2 - t1
 
-def time_distribution():
+def time_distribution(runs=100):
     """
-    Generate a DataFrame with random input values and measure the time distribution of optimal_profit.
+    Generate random pool pairs and measure the time distribution of solving them all at once.
 
+    :param runs: Number of times the batch is timed
+    :type runs: int
     :return: Descriptive statistics of the time distribution
     :rtype: pd.Series
     """
@@ -51,10 +56,12 @@ def time_distribution():
     eth_1 = np.random.uniform(3000, 5000, size=(100))
     dai_2 = np.random.uniform(7000000, 8000000, size=(100))
     eth_2 = np.random.uniform(3000, 5000, size=(100))
-    pool_df = pd.DataFrame({"x1": dai_1, "y1": eth_1, "x2": dai_2, "y2": eth_2})
-    pool_df[['time', 'iter']] = pool_df.apply(lambda row: time_optimal_profit(*row),axis=1)
-    print(pool_df.time.describe())
-    return pool_df.time.describe()
+    times = np.empty(runs, dtype=np.int64)
+    for i in range(runs):
+        times[i] = time_optimal_profit(dai_1, eth_1, dai_2, eth_2)
+    times = pd.Series(times * 1e-9, name='time')
+    print(times.describe())
+    return times.describe()
 
 if __name__ == '__main__':
     time_distribution()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import unittest
 import time
-from uniswap_arb import UniswapPool, simulate_arb
+from uniswap_arb import UniswapPool, simulate_arb, optimal_input, optimal_arb, optimal_profit, DAI, ETH
 from scipy.optimize import minimize, Bounds
+import numpy as np
 import pandas as pd
 
 class TestUniswap(unittest.TestCase):
@@ -53,6 +54,12 @@ class TestUniswap(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.pool.swap("SOL", 100)
     
+    def test_output(self):
+        self.assertAlmostEqual(self.pool.output(DAI, 10), 500 * 9.97 / 109.97)
+        self.assertAlmostEqual(self.pool.output(ETH, 10), 100 * 9.97 / 509.97)
+        with self.assertRaises(ValueError):
+            self.pool.output("DAI", 10)
+
     def test_increasing_k(self):
         k_before = self.pool.K
         self.pool.swap('DAI', 0.001)
@@ -63,5 +70,30 @@ class TestUniswap(unittest.TestCase):
         k_after = self.pool.K
         self.assertGreater(k_after, k_before, "k must increase after swap")
 
+    def test_optimal_input(self):
+        pools = (7400000, 5000, 7500000, 4000)
+        eth_in = optimal_input(*pools)
+        profit = simulate_arb(eth_in, *pools)
+        self.assertGreater(profit, 0)
+        self.assertGreater(profit, simulate_arb(eth_in * 0.99, *pools), "closed form must be the maximum")
+        self.assertGreater(profit, simulate_arb(eth_in * 1.01, *pools), "closed form must be the maximum")
+
+    def test_optimal_arb(self):
+        pools = np.array([[7400000, 5000, 7500000, 4000], [7400000, 4000, 7500000, 5000]], dtype=float)
+        eth_in, profit = optimal_arb(*pools.T)
+        for i, row in enumerate(pools):
+            self.assertAlmostEqual(eth_in[i], optimal_input(*row))
+            self.assertAlmostEqual(profit[i], simulate_arb(eth_in[i], *row))
+
+    def test_optimal_arb_unprofitable(self):
+        equal_prices = [7400000, 5000, 7400000, 5000]
+        sub_fee_spread = [7400000, 5000, 7400100, 5000]
+        eth_in, profit = optimal_arb(*np.array([equal_prices, sub_fee_spread], dtype=float).T)
+        np.testing.assert_array_equal(eth_in, [0, 0])
+        np.testing.assert_array_equal(profit, [0, 0])
+        with self.assertRaises(ValueError):
+            optimal_profit(*equal_prices)
+        self.assertEqual(optimal_profit(*sub_fee_spread), 0)
+
 if __name__ == '__main__':
     unittest.main()